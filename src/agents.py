@@ -1,52 +1,106 @@
 import random
-from collections import defaultdict
-from typing import Dict, List, Callable
+from typing import Callable, Union
 
-from .env import ACTIONS, state_ss
+import numpy as np
+
+from .env import ACTIONS, state_ss, state_id, state_ids
 
 Policy = Callable[[state_ss], int]
 
+# agents accept either a state tuple or its packed state_id()
+State = Union[state_ss, int]
+_ID_TYPES = (int, np.integer)
+
+
+def as_sid(s: State, G: int) -> int:
+    """Packed id for s; ints (including NumPy ids from VecLaneEnv) pass through."""
+    return s if isinstance(s, _ID_TYPES) else state_id(s, G)
+
 
 class QLearningAgent:
-    def __init__(self, alpha=0.15, gamma=0.95, eps=0.15):
+    def __init__(self, alpha=0.15, gamma=0.95, eps=0.15, G=3, dtype=np.float32):
         self.alpha = alpha
         self.gamma = gamma
         self.eps = eps
+        self.G = G
 
-        self.actions = list(ACTIONS)
+        # Q[w, m_self, m_opp, v_self, v_opp, g] -> [Q(s,SP), Q(s,SH), Q(s,F)]
+        # float32 by default, float16 halves it again if precision allows
+        self.Q = np.zeros((5, 3, 3, 2, 2, 2 * G + 1, len(ACTIONS)), dtype=dtype)
+        # same memory viewed as Qf[state_id] -> row, and flat as q[state_id*3 + a]
+        self.Qf = self.Q.reshape(-1, len(ACTIONS))
+        self._q = self.Q.reshape(-1)
 
-        # Q maps: state -> [Q(s,SP), Q(s,SH), Q(s,F)]
-        self.Q: Dict[state_ss, List[float]] = defaultdict(
-            lambda: [0.0 for _ in self.actions]
-        )
+    def sid(self, s: State) -> int:
+        return as_sid(s, self.G)
 
-    def act(self, s: state_ss) -> int:
+    def act(self, s: State) -> int:
         # e-greedy
         if random.random() < self.eps:
-            return random.choice(self.actions)
+            return random.choice(ACTIONS)
+
+        if not isinstance(s, _ID_TYPES):
+            s = state_id(s, self.G)
+
+        # argmax over 3 actions, first max wins like np.argmax
+        q0, q1, q2 = self.Qf[s].tolist()
+        return 0 if q0 >= q1 and q0 >= q2 else (1 if q1 >= q2 else 2)
+
+    def update(self, s: State, a: int, r: float, s_next: State) -> None:
+        # pass packed ids (e.g. from LaneEnv.step_ids) to skip the encoding
+        if not isinstance(s, _ID_TYPES):
+            s = state_id(s, self.G)
+        if not isinstance(s_next, _ID_TYPES):
+            s_next = state_id(s_next, self.G)
 
-        q = self.Q[s]
-        best_i = max(range(len(self.actions)), key=lambda i: q[i])
-        return self.actions[best_i]
+        # scalar reads/writes through the flat view, .item() skips NumPy scalars
+        q = self._q
+        k = s * 3 + a
+        q_sa = q.item(k)
+
+        target = r + self.gamma * max(self.Qf[s_next].tolist())
+        q[k] = q_sa + self.alpha * (target - q_sa)
+
+    # ---- batched (VecLaneEnv) ----
+    def state_ids(self, s) -> np.ndarray:
+        """Flat Q-table row index for each state in a batch of (N,) arrays."""
+        return state_ids(*s, self.G)
+
+    def act_batch(self, sid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # e-greedy, drawn independently per episode from the caller's rng
+        # (e.g. VecLaneEnv.rng) so batched runs are reproducible
+        a = self.Qf[sid].argmax(axis=1)
+        explore = rng.random(len(sid)) < self.eps
+        a[explore] = rng.integers(len(ACTIONS), size=int(explore.sum()))
+        return a
+
+    def update_batch(self, sid: np.ndarray, a: np.ndarray, r: np.ndarray, sid_next: np.ndarray) -> None:
+        """
+        N TD updates in one pass. Duplicate (s, a) pairs in the batch are
+        averaged into a single step, so a popular state is not moved
+        N times further than a rare one.
+        """
+        Qf = self.Qf
+        q_sa = Qf[sid, a]
 
-    def update(self, s: state_ss, a: int, r: float, s_next: state_ss) -> None:
-        a_i = self.actions.index(a)
-        q_sa = self.Q[s][a_i]
+        target = r + self.gamma * Qf[sid_next].max(axis=1)
 
-        target = r + self.gamma * max(self.Q[s_next])
-        self.Q[s][a_i] = q_sa + self.alpha * (target - q_sa)
+        flat = sid * len(ACTIONS) + a
+        td_sum = np.bincount(flat, weights=target - q_sa, minlength=self.Q.size)
+        n = np.bincount(flat, minlength=self.Q.size)
+        hit = n > 0
+        Qf.reshape(-1)[hit] += self.alpha * td_sum[hit] / n[hit]
 
     def snapshot_greedy_policy(self) -> Policy:
         """
         Freeze the current greedy policy (based on Q)
         so it can be used as a new policy to be used by opponent agent
         """
-        Q_copy = {k: v[:] for k, v in self.Q.items()}
-        actions = self.actions[:]
+        # argmax once here, so acting is a single table load
+        table = np.argmax(self.Qf, axis=-1).astype(np.int8)
+        G = self.G
 
-        def pi(s: state_ss) -> int:
-            q = Q_copy.get(s, [0.0 for _ in actions])
-            best_i = max(range(len(actions)), key=lambda i: q[i])
-            return actions[best_i]
+        def pi(s: State) -> int:
+            return int(table[as_sid(s, G)])
 
         return pi
\ No newline at end of file
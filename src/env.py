@@ -1,51 +1,218 @@
+from dataclasses import dataclass, fields
 from typing import Tuple
-from .utils import bernoulli
+
+import numpy as np
+
+from .utils import bernoulli, uniform
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional, without it the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 # Actions
 SP, SH, F = 0, 1, 2
 ACTIONS = [SP, SH, F]
 
+# Rock paper scissors sign of a vs b, rows = a, cols = b:
+# SH beats SP, F beats SH, SP beats F
+PAYOFF = np.array([
+    [0, -1, +1],
+    [+1, 0, -1],
+    [-1, +1, 0],
+], dtype=np.float32)
+
 # Observation/state tuple initializatoin, 
 # (w_self, m_self, m_opp, v_self, v_opp, g_self)
 state_ss = Tuple[int, int, int, int, int, int]
 
 
-def I(cond: bool) -> int:
-    """Indicator: 1 if cond else 0."""
-    return 1 if cond else 0
+def state_id(s: state_ss, G: int) -> int:
+    """
+    Pack a state tuple into one int, the row-major index of
+    (w+2, m_self, m_opp, v_self, v_opp, g+G) over (5, 3, 3, 2, 2, 2G+1).
+    g is real-valued, so it is binned to the nearest integer; a bin
+    outside [-G, G] means G doesn't match the env and would alias
+    another state's id, so it is rejected.
+    """
+    w, m_self, m_opp, v_self, v_opp, g = s
+    g_i = round(g)
+    if not -G <= g_i <= G:
+        raise ValueError(f"g={g} is outside [-G, G] for G={G}")
+    return (((((w + 2) * 3 + m_self) * 3 + m_opp) * 2 + v_self) * 2 + v_opp) * (2 * G + 1) + g_i + G
+
+
+def state_ids(w, m_self, m_opp, v_self, v_opp, g, G: int) -> np.ndarray:
+    """Batched state_id() over (N,) arrays, computed in int32 so int8 fields can't overflow."""
+    sid = w.astype(np.int32) + 2
+    sid = (((sid * 3 + m_self) * 3 + m_opp) * 2 + v_self) * 2 + v_opp
+    g_i = np.rint(g).astype(np.int32)
+    if (np.abs(g_i) > G).any():
+        raise ValueError(f"g is outside [-G, G] for G={G}")
+    return sid * (2 * G + 1) + g_i + G
 
 
+@dataclass(frozen=True, slots=True)
 class LaneParams:
     """Parameters for LaneEnv."""
-    def __init__(
-        self,
-        T=40,
-        G=3,
-        eps=0.3,
-        p_v=0.6,
-        b_plates=0.6,
-        b_deny=0.4,
-        b_deny_bonus=0.2,
-        b_crash=0.8,
-        q0=0.05,
-        q1=0.20,
-        q2=0.15,
-        L=5.0,
-    ):
-        self.T = T
-        self.G = G
-        self.eps = eps
-        self.p_v = p_v
-
-        self.b_plates = b_plates
-        self.b_deny = b_deny
-        self.b_deny_bonus = b_deny_bonus
-        self.b_crash = b_crash
-
-        self.q0 = q0
-        self.q1 = q1
-        self.q2 = q2
-        self.L = L
+    T: int = 40
+    G: int = 3
+    eps: float = 0.3
+    p_v: float = 0.6
+
+    b_plates: float = 0.6
+    b_deny: float = 0.4
+    b_deny_bonus: float = 0.2
+    b_crash: float = 0.8
+
+    q0: float = 0.05
+    q1: float = 0.20
+    q2: float = 0.15
+    L: float = 5.0
+
+    def as_array(self) -> np.ndarray:
+        """All fields packed as float32, in declaration order."""
+        return np.array([getattr(self, f.name) for f in fields(self)], dtype=np.float32)
+
+
+def reward_table(p: LaneParams) -> np.ndarray:
+    """
+    Deterministic part of LaneEnv.reward (everything except the gank
+    penalty) for every input, as R_det[w+2, m, a_self, a_opp, w_next+2].
+    float64, so LaneEnv rewards match the closed form exactly.
+    """
+    R_det = np.zeros((5, 3, 3, 3, 5))
+    for w in range(-2, 3):
+        for m in range(3):
+            for a_self in ACTIONS:
+                for a_opp in ACTIONS:
+                    for w_next in range(-2, 3):
+                        r = p.eps * float(PAYOFF[a_self, a_opp])
+
+                        # bools are ints, so each comparison is its own indicator
+                        r += p.b_plates * (a_self == SH) * (w >= 1)
+
+                        r += p.b_deny * (a_self == F) * (w <= -1)
+                        r += p.b_deny_bonus * (a_self == F) * (w <= -1) * (a_opp in (SP, SH))
+
+                        r += p.b_crash * (w_next == 2) * (m == 2)
+
+                        R_det[w + 2, m, a_self, a_opp, w_next + 2] = r
+    return R_det
+
+
+def gank_table(p: LaneParams) -> np.ndarray:
+    """Gank probability for every input, as P_GANK[w+2, v, a]."""
+    P_GANK = np.zeros((5, 2, 3))
+    for w in range(-2, 3):
+        for v in (0, 1):
+            for a in ACTIONS:
+                base = p.q0 + p.q1 * (w == 2) + p.q2 * (a == SH)
+                base = max(0.0, min(1.0, base))
+                P_GANK[w + 2, v, a] = (1 - v) * base
+    return P_GANK
+
+
+# ---- step kernels ----
+# Scalar-in, scalar-out versions of the LaneEnv dynamics, compiled with
+# numba when available. Randomness comes in as pre-drawn uniforms so the
+# kernels share the seeded stream in utils.
+
+# delta_w, indexed by action
+_DW = (+1, +2, -1)
+
+
+def _stack_table() -> np.ndarray:
+    """
+    Stack update (in player's own perspective) for every input, as
+    STACK_TABLE[m, a, w_next == 2]:
+      SP: build until 2 (if not already crashed)
+      SH: if crash at w_next==2, reset to 0
+      F : trim by 1
+    """
+    table = np.empty((3, 3, 2), dtype=np.int8)
+    for m in range(3):
+        for a in ACTIONS:
+            for crash in (0, 1):
+                if a == SP and not crash:
+                    m_next = min(2, m + 1)
+                elif a == SH and crash:
+                    m_next = 0
+                elif a == F:
+                    m_next = max(0, m - 1)
+                else:
+                    m_next = m
+                table[m, a, crash] = m_next
+    return table
+
+
+STACK_TABLE = _stack_table()
+
+
+@njit(cache=True)
+def _delta_w(a):
+    return _DW[a]
+
+
+@njit(cache=True)
+def _update_stack(m, a, w_next):
+    return int(STACK_TABLE[m, a, int(w_next == 2)])
+
+
+@njit(cache=True)
+def _reward_kernel(w, m, v, a_self, a_opp, w_next, u, R_det, P_GANK, L):
+    gank = 1 if u < P_GANK[w + 2, v, a_self] else 0
+    return float(R_det[w + 2, m, a_self, a_opp, w_next + 2]) - L * gank
+
+
+@njit(cache=True)
+def _step_kernel(w, m_self, m_opp, v_self, v_opp, g, a_self, a_opp, u_self, u_opp, NEXT, R_PAIR, P_GANK, L, G):
+    # deterministic part is one row of the transition tables
+    nxt = NEXT[w + 2, m_self, m_opp, a_self, a_opp]
+    r = R_PAIR[w + 2, m_self, m_opp, a_self, a_opp]
+
+    # ganks, opp sees the mirrored wave
+    r_self = float(r[0]) - L * (1 if u_self < P_GANK[w + 2, v_self, a_self] else 0)
+    r_opp = float(r[1]) - L * (1 if u_opp < P_GANK[2 - w, v_opp, a_opp] else 0)
+
+    g_next = max(-G, min(G, g + (r_self - r_opp)))
+
+    return int(nxt[0]), int(nxt[1]), int(nxt[2]), g_next, r_self, r_opp
+
+
+def transition_tables(R_det: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deterministic part of LaneEnv.step for every (w+2, m_self, m_opp, a_self, a_opp):
+      NEXT[...]   = (w_next, m_self_next, m_opp_next)
+      R_PAIR[...] = (r_self, r_opp) before the gank penalties
+    Vision and ganks are the only randomness, so this plus P_GANK and
+    p_v fully specifies the transition.
+    """
+    NEXT = np.empty((5, 3, 3, 3, 3, 3), dtype=np.int8)
+    R_PAIR = np.empty((5, 3, 3, 3, 3, 2), dtype=R_det.dtype)
+    for w in range(-2, 3):
+        for m_self in range(3):
+            for m_opp in range(3):
+                for a_self in ACTIONS:
+                    for a_opp in ACTIONS:
+                        k = (w + 2, m_self, m_opp, a_self, a_opp)
+                        # wave transition (global, from your perspective)
+                        w_next = max(-2, min(2, w + _delta_w(a_self) - _delta_w(a_opp)))
+
+                        NEXT[k] = (
+                            w_next,
+                            _update_stack(m_self, a_self, w_next),
+                            _update_stack(m_opp, a_opp, -w_next),
+                        )
+                        R_PAIR[k] = (
+                            R_det[w + 2, m_self, a_self, a_opp, w_next + 2],
+                            R_det[-w + 2, m_opp, a_opp, a_self, -w_next + 2],
+                        )
+    return NEXT, R_PAIR
 
 
 class LaneEnv:
@@ -62,6 +229,17 @@ class LaneEnv:
 
     def __init__(self, params: LaneParams):
         self.p = params
+        self.R_det = reward_table(params)
+        self.P_GANK = gank_table(params)
+        self.NEXT, self.R_PAIR = transition_tables(self.R_det)
+
+        # params read every step, cached to skip the self.p indirection
+        self._L = params.L
+        self._eps = params.eps
+        self._G = params.G
+        self._T = params.T
+        self._p_v = params.p_v
+
         self.reset()
 
     # ---- observations ----
@@ -72,14 +250,15 @@ class LaneEnv:
         # mirrored for enemy
         return (-self.w, self.m_opp, self.m_self, self.v_opp, self.v_self, -self.g)
 
+    # packed state_id() forms
+    def ss_you_id(self) -> int:
+        return state_id(self.ss_you(), self._G)
+
+    def ss_opp_id(self) -> int:
+        return state_id(self.ss_opp(), self._G)
+
     def delta_w(self, a: int) -> int:
-        if a == SP:
-            return +1
-        if a == SH:
-            return +2
-        if a == F:
-            return -1
-        raise ValueError("Invalid action (must be SP, SH, or F).")
+        return _delta_w(a)
 
     def payoff_matrix(self, a: int, b: int) -> float:
         """
@@ -88,17 +267,10 @@ class LaneEnv:
           F beats SH
           SP beats F
         """
-        e = self.p.eps
-        if a == b:
-            return 0.0
-
-        wins = {(SH, SP), (F, SH), (SP, F)}
-        return +e if (a, b) in wins else -e
+        return self._eps * float(PAYOFF[a, b])
 
     def p_gank(self, w: int, v: int, a: int) -> float:
-        base = self.p.q0 + self.p.q1 * I(w == 2) + self.p.q2 * I(a == SH)
-        base = max(0.0, min(1.0, base))
-        return (1 - v) * base
+        return float(self.P_GANK[w + 2, v, a])
 
     def update_stack(self, m: int, a: int, w_next: int) -> int:
         """
@@ -107,21 +279,15 @@ class LaneEnv:
           SH: if crash at w_next==2, reset to 0
           F : trim by 1
         """
-        if a == SP and w_next < 2:
-            return min(2, m + 1)
-        if a == SH and w_next == 2:
-            return 0
-        if a == F:
-            return max(0, m - 1)
-        return m
+        return _update_stack(m, a, w_next)
 
     # ---- reset ----
     def reset(self):
         self.w = 0
         self.m_self = 0
         self.m_opp = 0
-        self.v_self = bernoulli(self.p.p_v)
-        self.v_opp = bernoulli(self.p.p_v)
+        self.v_self = bernoulli(self._p_v)
+        self.v_opp = bernoulli(self._p_v)
         self.g = 0
         self.t = 0
         return self.ss_you(), self.ss_opp()
@@ -136,53 +302,45 @@ class LaneEnv:
             + b_crash  * 1[w_next=2]*1[m=2]
             - L * gank,  gank ~ Bernoulli(p_gank(w,v,a))
         """
-        r = 0.0
-        r += self.payoff_matrix(a_self, a_opp)
-
-        r += self.p.b_plates * I(a_self == SH) * I(w >= 1)
-
-        r += self.p.b_deny * I(a_self == F) * I(w <= -1)
-        r += self.p.b_deny_bonus * I(a_self == F) * I(w <= -1) * I(a_opp in (SP, SH))
-
-        r += self.p.b_crash * I(w_next == 2) * I(m == 2)
-
-        gank = bernoulli(self.p_gank(w, v, a_self))
-        r -= self.p.L * gank
-
-        return r
+        return _reward_kernel(w, m, v, a_self, a_opp, w_next, uniform(), self.R_det, self.P_GANK, self._L)
 
     # ---- step ----
     def step(self, a_self: int, a_opp: int):
-        # wave transition (global, from your perspective)
-        raw_w_next = self.w + self.delta_w(a_self) - self.delta_w(a_opp)
-        w_next = max(-2, min(2, raw_w_next))
+        rewards, done = self._advance(a_self, a_opp)
+        return (self.ss_you(), self.ss_opp()), rewards, done
 
-        # set perspectives 
-        w_self = self.w
-        w_opp = -self.w
-        w_next_self = w_next
-        w_next_opp = -w_next
+    def step_ids(self, a_self: int, a_opp: int):
+        """
+        Same as step(), but your observation comes back as its packed
+        state id for the tabular agent; the opponent's stays a tuple for
+        the scripted policies.
+        """
+        rewards, done = self._advance(a_self, a_opp)
+        return (self.ss_you_id(), self.ss_opp()), rewards, done
 
-        # set rewards
-        r_self = self.reward(w_self, self.m_self, self.v_self, a_self, a_opp, w_next_self)
-        r_opp = self.reward(w_opp, self.m_opp, self.v_opp, a_opp, a_self, w_next_opp)
+    def _advance(self, a_self: int, a_opp: int):
+        # the kernels index tables by action, so reject bad ones here
+        if not (0 <= a_self <= 2 and 0 <= a_opp <= 2):
+            raise ValueError("Invalid action (must be SP, SH, or F).")
 
-        # set gold
-        raw_g_next = self.g + (r_self - r_opp)
-        g_next = max(-self.p.G, min(self.p.G, raw_g_next))
+        # one uniform per gank draw, self then opp
+        u_self = uniform()
+        u_opp = uniform()
 
-        # set wave stacks
-        self.m_self = self.update_stack(self.m_self, a_self, w_next_self)
-        self.m_opp = self.update_stack(self.m_opp, a_opp, w_next_opp)
+        w_next, self.m_self, self.m_opp, g_next, r_self, r_opp = _step_kernel(
+            self.w, self.m_self, self.m_opp, self.v_self, self.v_opp, self.g,
+            a_self, a_opp, u_self, u_opp, self.NEXT, self.R_PAIR, self.P_GANK, self._L, self._G,
+        )
 
         # apply updates to wave, gold, vision
         self.w = w_next
         self.g = g_next
-        self.v_self = bernoulli(self.p.p_v)
-        self.v_opp = bernoulli(self.p.p_v)
+        p_v = self._p_v
+        self.v_self = bernoulli(p_v)
+        self.v_opp = bernoulli(p_v)
 
         self.t += 1
         # done is our flag for episode termination
-        done = (self.t >= self.p.T)
+        done = (self.t >= self._T)
 
-        return (self.ss_you(), self.ss_opp()), (r_self, r_opp), done
+        return (r_self, r_opp), done
@@ -8,6 +8,9 @@ ACTION_NAMES = {SP: "SP", SH: "SH", F: "F"}
 
 
 def evaluate(agent: QLearningAgent, env: LaneEnv, opponents: Dict[str, Policy], games: int = 200):
+    if agent.G != env.p.G:
+        raise ValueError(f"agent.G={agent.G} does not match env G={env.p.G}")
+
     old_eps = agent.eps
     agent.eps = 0.0  
 
@@ -18,18 +21,18 @@ def evaluate(agent: QLearningAgent, env: LaneEnv, opponents: Dict[str, Policy],
         action_counts = {SP: 0, SH: 0, F: 0}
 
         for _ in range(games):
-            obs_y, obs_o = env.reset()
+            _, obs_o = env.reset()
+            s_y = env.ss_you_id()
             done = False
             ep_return = 0.0
 
             while not done:
-                a_y = agent.act(obs_y)
+                a_y = agent.act(s_y)
                 a_o = opp_pi(obs_o)
                 action_counts[a_y] += 1
 
-                (obs_y2, obs_o2), (r_y, r_o), done = env.step(a_y, a_o)
+                (s_y, obs_o), (r_y, r_o), done = env.step_ids(a_y, a_o)
                 ep_return += r_y
-                obs_y, obs_o = obs_y2, obs_o2
 
             total_return += ep_return
             
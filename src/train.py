@@ -1,6 +1,10 @@
-from typing import List, Dict
+import multiprocessing
+from functools import partial
+from typing import List, Dict, Tuple
 
-from .env import LaneEnv
+import numpy as np
+
+from .env import LaneEnv, LaneParams
 from .agents import QLearningAgent
 from .policies import Policy, always_shove, freeze_if_possible, stack_then_crash, random_mixed
 from .eval import evaluate
@@ -17,6 +21,9 @@ def train_with_opponent_pool(
     eval_games: int = 200,
     fixed_eval_opponents: Dict[str, Policy] | None = None,
 ):
+    if agent.G != env.p.G:
+        raise ValueError(f"agent.G={agent.G} does not match env G={env.p.G}")
+
     if fixed_eval_opponents is None:
         fixed_eval_opponents = {
             "always_shove": always_shove,
@@ -29,16 +36,18 @@ def train_with_opponent_pool(
     for ep in range(1, episodes + 1):
         opp_pi = pool[ep % len(pool)]  
 
-        obs_y, obs_o = env.reset()
+        _, obs_o = env.reset()
+        # agent side works on packed state ids, encoded once per step
+        s_y = env.ss_you_id()
         done = False
 
         while not done:
-            a_y = agent.act(obs_y)
+            a_y = agent.act(s_y)
             a_o = opp_pi(obs_o)
 
-            (obs_y2, obs_o2), (r_y, r_o), done = env.step(a_y, a_o)
-            agent.update(obs_y, a_y, r_y, obs_y2)
-            obs_y, obs_o = obs_y2, obs_o2
+            (s_y2, obs_o), (r_y, r_o), done = env.step_ids(a_y, a_o)
+            agent.update(s_y, a_y, r_y, s_y2)
+            s_y = s_y2
 
         # snapshot current greedy policy into the pool
         if snapshot_every and ep % snapshot_every == 0:
@@ -54,23 +63,60 @@ def train_with_opponent_pool(
     return log
 
 
-def main():
-    from .env import LaneParams
-
-    set_seed(0)
-
-    params = LaneParams(T=40, p_v=0.6, L=5.0)
-    env = LaneEnv(params)
-    agent = QLearningAgent(alpha=0.12, gamma=0.95, eps=0.15)
-
+def baseline_pool() -> List[Policy]:
     # Start pool with baselines + a random-mixed style
-    pool: List[Policy] = [
+    return [
         always_shove,
         freeze_if_possible,
         stack_then_crash,
         random_mixed(0.4, 0.4, 0.2),
     ]
 
+
+def make_env_and_agent() -> Tuple[LaneEnv, QLearningAgent]:
+    params = LaneParams(T=40, p_v=0.6, L=5.0)
+    env = LaneEnv(params)
+    agent = QLearningAgent(alpha=0.12, gamma=0.95, eps=0.15, G=params.G)
+    return env, agent
+
+
+def train_one_agent(seed: int, episodes: int = 5000, snapshot_every: int = 500) -> np.ndarray:
+    """Train a fresh agent from seed against the baseline pool, return its Q-table."""
+    set_seed(seed)
+    env, agent = make_env_and_agent()
+
+    train_with_opponent_pool(
+        env=env,
+        agent=agent,
+        pool=baseline_pool(),
+        episodes=episodes,
+        snapshot_every=snapshot_every,
+        eval_every=0,
+    )
+    return agent.Q
+
+
+def train_many(
+    n_seeds: int,
+    episodes: int = 5000,
+    snapshot_every: int = 500,
+    processes: int | None = None,
+) -> np.ndarray:
+    """
+    Run train_one_agent for seeds 0..n_seeds-1 in parallel worker processes.
+    Returns the Q-tables stacked along a leading seed axis.
+    """
+    with multiprocessing.Pool(processes) as workers:
+        Qs = workers.map(partial(train_one_agent, episodes=episodes, snapshot_every=snapshot_every), range(n_seeds))
+    return np.stack(Qs)
+
+
+def main():
+    set_seed(0)
+    env, agent = make_env_and_agent()
+
+    pool = baseline_pool()
+
     train_with_opponent_pool(
         env=env,
         agent=agent,
@@ -1,7 +1,41 @@
 import random
 
+import numpy as np
+
+
+class FastRng:
+    """Uniform [0, 1) draws served from a pre-filled NumPy (PCG64) buffer."""
+    def __init__(self, seed=None, size=1 << 16):
+        self.rng = np.random.default_rng(seed)
+        self.n = size
+        self._refill()
+
+    def _refill(self) -> None:
+        # tolist() so each draw is a plain Python float
+        self.buf = self.rng.random(self.n).tolist()
+        self.i = 0
+
+    def seed(self, seed: int) -> None:
+        self.rng = np.random.default_rng(seed)
+        self._refill()
+
+    def uniform(self) -> float:
+        if self.i >= self.n:
+            self._refill()
+        v = self.buf[self.i]
+        self.i += 1
+        return v
+
+
+_frng = FastRng()
+
+
 def set_seed(seed: int) -> None:
     random.seed(seed)
+    _frng.seed(seed)
+
+def uniform() -> float:
+    return _frng.uniform()
 
 def bernoulli(p: float) -> int:
-    return 1 if random.random() < p else 0
\ No newline at end of file
+    return 1 if _frng.uniform() < p else 0
\ No newline at end of file
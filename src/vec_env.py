@@ -0,0 +1,98 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .env import LaneParams, gank_table, reward_table, state_ids, transition_tables
+
+# Batched observation: one array of shape (N,) per state component
+# (w_self, m_self, m_opp, v_self, v_opp, g_self)
+state_batch = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class VecLaneEnv:
+    """
+    N independent copies of LaneEnv advanced in lockstep.
+
+    Same dynamics as LaneEnv, but every state component is an array
+    of shape (N,) and step() takes arrays of actions for all N episodes.
+    State is stored field by field: int8 for the discrete components,
+    float32 for the real-valued gold diff g.
+    """
+
+    def __init__(self, params: LaneParams, N: int, seed: Optional[int] = None):
+        self.p = params
+        self.N = N
+        self.rng = np.random.default_rng(seed)
+        # same transition tables as LaneEnv; float32 rewards to match the compact float32 g
+        self.NEXT, R_PAIR = transition_tables(reward_table(params))
+        self.R_PAIR = R_PAIR.astype(np.float32)
+        self.P_GANK = gank_table(params)
+
+        self.reset()
+
+    # ---- observations ----
+    def ss_you(self) -> state_batch:
+        return (self.w, self.m_self, self.m_opp, self.v_self, self.v_opp, self.g)
+
+    def ss_opp(self) -> state_batch:
+        # mirrored for enemy
+        return (-self.w, self.m_opp, self.m_self, self.v_opp, self.v_self, -self.g)
+
+    # packed state_id() forms, one int32 per episode
+    def ss_you_ids(self) -> np.ndarray:
+        return state_ids(*self.ss_you(), self.p.G)
+
+    def ss_opp_ids(self) -> np.ndarray:
+        return state_ids(*self.ss_opp(), self.p.G)
+
+    def bernoulli(self, p) -> np.ndarray:
+        p = np.broadcast_to(p, (self.N,))
+        return (self.rng.random(self.N) < p).astype(np.int8)
+
+    # ---- reset ----
+    def reset(self):
+        N = self.N
+        self.w = np.zeros(N, dtype=np.int8)
+        self.m_self = np.zeros(N, dtype=np.int8)
+        self.m_opp = np.zeros(N, dtype=np.int8)
+        self.v_self = self.bernoulli(self.p.p_v)
+        self.v_opp = self.bernoulli(self.p.p_v)
+        self.g = np.zeros(N, dtype=np.float32)
+        # int16 so T is not capped at 127
+        self.t = np.zeros(N, dtype=np.int16)
+        return self.ss_you(), self.ss_opp()
+
+    # ---- step ----
+    def step(self, a_self: np.ndarray, a_opp: np.ndarray):
+        a_self = np.asarray(a_self)
+        a_opp = np.asarray(a_opp)
+        # the lookups index tables by action, so reject bad ones here
+        if ((a_self < 0) | (a_self > 2) | (a_opp < 0) | (a_opp > 2)).any():
+            raise ValueError("Invalid action (must be SP, SH, or F).")
+
+        # deterministic part is one row of the transition tables per episode
+        k = (self.w + 2, self.m_self, self.m_opp, a_self, a_opp)
+        nxt = self.NEXT[k]
+        r = self.R_PAIR[k]
+
+        # ganks, opp sees the mirrored wave; float32 L keeps rewards float32
+        L = np.float32(self.p.L)
+        r_self = r[:, 0] - L * self.bernoulli(self.P_GANK[self.w + 2, self.v_self, a_self])
+        r_opp = r[:, 1] - L * self.bernoulli(self.P_GANK[2 - self.w, self.v_opp, a_opp])
+
+        # set gold
+        g_next = np.clip(self.g + (r_self - r_opp), -self.p.G, self.p.G).astype(np.float32)
+
+        # apply updates to wave, stacks, gold, vision
+        self.w = nxt[:, 0]
+        self.m_self = nxt[:, 1]
+        self.m_opp = nxt[:, 2]
+        self.g = g_next
+        self.v_self = self.bernoulli(self.p.p_v)
+        self.v_opp = self.bernoulli(self.p.p_v)
+
+        self.t += 1
+        # all N episodes run in lockstep, so they terminate together
+        done = bool(self.t[0] >= self.p.T)
+
+        return (self.ss_you(), self.ss_opp()), (r_self, r_opp), done
\ No newline at end of file
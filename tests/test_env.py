@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.env import ACTIONS, SP, SH, F, LaneEnv, LaneParams, reward_table, transition_tables
+from src.vec_env import VecLaneEnv
+
+
+# ---- reference rules, written out the way LaneEnv originally branched ----
+def ref_delta_w(a):
+    if a == SP:
+        return +1
+    if a == SH:
+        return +2
+    return -1
+
+
+def ref_update_stack(m, a, w_next):
+    if a == SP and w_next < 2:
+        return min(2, m + 1)
+    if a == SH and w_next == 2:
+        return 0
+    if a == F:
+        return max(0, m - 1)
+    return m
+
+
+def ref_reward_det(p, w, m, a_self, a_opp, w_next):
+    wins = {(SH, SP), (F, SH), (SP, F)}
+    r = 0.0 if a_self == a_opp else (p.eps if (a_self, a_opp) in wins else -p.eps)
+    r += p.b_plates * (a_self == SH) * (w >= 1)
+    r += p.b_deny * (a_self == F) * (w <= -1)
+    r += p.b_deny_bonus * (a_self == F) * (w <= -1) * (a_opp in (SP, SH))
+    r += p.b_crash * (w_next == 2) * (m == 2)
+    return r
+
+
+def test_transition_tables_match_rules():
+    p = LaneParams()
+    NEXT, R_PAIR = transition_tables(reward_table(p))
+
+    for w in range(-2, 3):
+        for m_self in range(3):
+            for m_opp in range(3):
+                for a_self in ACTIONS:
+                    for a_opp in ACTIONS:
+                        k = (w + 2, m_self, m_opp, a_self, a_opp)
+                        w_next = max(-2, min(2, w + ref_delta_w(a_self) - ref_delta_w(a_opp)))
+
+                        assert tuple(NEXT[k]) == (
+                            w_next,
+                            ref_update_stack(m_self, a_self, w_next),
+                            ref_update_stack(m_opp, a_opp, -w_next),
+                        )
+                        assert R_PAIR[k][0] == pytest.approx(ref_reward_det(p, w, m_self, a_self, a_opp, w_next))
+                        assert R_PAIR[k][1] == pytest.approx(ref_reward_det(p, -w, m_opp, a_opp, a_self, -w_next))
+
+
+def test_vec_env_matches_lane_env_without_ganks():
+    # no ganks -> the only randomness left is vision, which doesn't feed the dynamics
+    p = LaneParams(q0=0.0, q1=0.0, q2=0.0)
+    rng = np.random.default_rng(0)
+    N = 64
+
+    venv = VecLaneEnv(p, N, seed=0)
+    envs = [LaneEnv(p) for _ in range(N)]
+    for env in envs:
+        env.reset()
+
+    for _ in range(p.T):
+        a_self = rng.integers(0, 3, N)
+        a_opp = rng.integers(0, 3, N)
+        _, (r_self, r_opp), done = venv.step(a_self, a_opp)
+
+        for i, env in enumerate(envs):
+            _, (r_y, r_o), done_i = env.step(int(a_self[i]), int(a_opp[i]))
+            assert (venv.w[i], venv.m_self[i], venv.m_opp[i]) == (env.w, env.m_self, env.m_opp)
+            assert r_self[i] == pytest.approx(r_y, abs=1e-6)
+            assert r_opp[i] == pytest.approx(r_o, abs=1e-6)
+            assert venv.g[i] == pytest.approx(env.g, abs=1e-5)
+            assert done == done_i
\ No newline at end of file